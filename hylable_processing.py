@@ -1,13 +1,52 @@
-from typing import List, Dict, Union
+from typing import Any, Callable, Iterator, List, Dict, Set, Tuple, Union
 from pathlib import Path
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from functools import lru_cache
 import hylable
+from hylable.error import InternalServerError
+import requests
 import time
-from datetime import datetime
-import pytz
+import random
+import threading
+import json
+import sqlite3
+from datetime import datetime, timedelta, timezone
 from tqdm import tqdm
 
-# Hylableクライアントの初期化
-hy_client = hylable.HDClient(profile_name="default")
+# タイムゾーン（日本は夏時間がないため固定オフセットで表す。tzdataのないWindowsでも動作する）
+JST = timezone(timedelta(hours=9), 'JST')
+UTC = timezone.utc
+
+# ファイル名に使えない文字の置き換えテーブル（Windowsの禁止文字を全角に置き換え、NULは削除）
+_FILENAME_TRANSLATION = str.maketrans({
+    '/': '／', '\\': '＼', ':': '：', '*': '＊', '?': '？',
+    '"': '＂', '<': '＜', '>': '＞', '|': '｜', '\0': None
+})
+
+# APIレスポンスのキャッシュ設定
+CACHE_TTL_SEC: float = 60
+CACHE_MAXSIZE: int = 1024
+_cache: Dict[Tuple[str, str], Tuple[float, Any]] = {}
+_inflight: Dict[Tuple[str, str], Future] = {}
+_cache_lock = threading.Lock()
+
+# API呼び出しのリトライ設定
+RETRY_MAX_ATTEMPTS: int = 5
+RETRY_MAX_DELAY_SEC: float = 10
+
+@lru_cache(maxsize=None)
+def get_hy_client(profile_name: str = "default") -> hylable.HDClient:
+    """
+    Hylableクライアントを取得します。
+    初回呼び出し時にログインを行い、以降は同じインスタンスを返します。
+
+    Args:
+        profile_name (str, optional): ~/.hylable/configのプロファイル名。デフォルトは「default」。
+
+    Returns:
+        hylable.HDClient: Hylableクライアントインスタンス
+    """
+    return hylable.HDClient(profile_name=profile_name)
 
 def seconds_to_time_format(seconds: int) -> str:
     """
@@ -19,11 +58,121 @@ def seconds_to_time_format(seconds: int) -> str:
     Returns:
         str: 「00_00_00」形式の文字列
     """
-    hours = seconds // 3600
-    minutes = (seconds % 3600) // 60
-    remaining_seconds = seconds % 60
+    hours, remainder = divmod(seconds, 3600)
+    minutes, remaining_seconds = divmod(remainder, 60)
     return f"{hours:02d}_{minutes:02d}_{remaining_seconds:02d}"
 
+def _sanitize_filename_part(text: str) -> str:
+    """
+    ファイル名に使えない文字を全角文字に置き換えます（NUL文字は削除します）。
+
+    Args:
+        text (str): ファイル名の一部に使う文字列
+
+    Returns:
+        str: 置き換え後の文字列
+    """
+    return text.translate(_FILENAME_TRANSLATION)
+
+def _backoff_sleep(
+    attempt: int,
+    base: float = 0.5,
+    cap: float = 5.0,
+    remaining: Union[float, None] = None
+) -> None:
+    """
+    試行回数に応じた指数バックオフ（ジッター付き）で待機します。
+
+    Args:
+        attempt (int): これまでの試行回数（0始まり）
+        base (float, optional): 最初の待機秒数。デフォルトは0.5秒。
+        cap (float, optional): 待機秒数の上限。デフォルトは5秒。
+        remaining (Union[float, None], optional): タイムアウトまでの残り秒数。
+            指定した場合はこれを超えて待機しない。デフォルトはNone（期限なし）。
+    """
+    delay = min(cap, base * 2 ** attempt)
+    if remaining is not None:
+        delay = min(delay, remaining)
+    time.sleep(delay + random.uniform(0, delay * 0.1))
+
+def _is_retryable(error: Exception) -> bool:
+    """
+    再試行で回復が見込める一時的なエラーかどうかを判定します。
+
+    Args:
+        error (Exception): API呼び出しで発生した例外
+
+    Returns:
+        bool: タイムアウト・接続エラー・サーバーエラー・レート制限（429）の場合はTrue
+    """
+    if isinstance(error, (requests.Timeout, requests.ConnectionError, InternalServerError)):
+        return True
+    # Hylable SDKはHTTPステータスを公開しないため、API Gatewayの429はメッセージで判定する
+    return "Too Many Requests" in str(error)
+
+def _call_with_retry(
+    fetch_fn: Callable[[], Any],
+    max_attempts: int = RETRY_MAX_ATTEMPTS,
+    base: float = 0.5,
+    cap: float = RETRY_MAX_DELAY_SEC
+) -> Any:
+    """
+    一時的なエラーの場合に指数バックオフ（ジッター付き）で再試行しながらAPIを呼び出します。
+
+    Args:
+        fetch_fn (Callable[[], Any]): API呼び出し処理
+        max_attempts (int, optional): 最大試行回数。デフォルトはRETRY_MAX_ATTEMPTS。
+        base (float, optional): 最初の待機秒数。デフォルトは0.5秒。
+        cap (float, optional): 待機秒数の上限。デフォルトはRETRY_MAX_DELAY_SEC。
+
+    Returns:
+        Any: fetch_fnの戻り値
+    """
+    for attempt in range(max_attempts):
+        try:
+            return fetch_fn()
+        except Exception as e:
+            if attempt == max_attempts - 1 or not _is_retryable(e):
+                raise
+            print(f"API呼び出しに失敗したため再試行します（{attempt + 1}/{max_attempts - 1}）: {str(e)}")
+            _backoff_sleep(attempt, base, cap)
+
+def _poll_attempts(
+    timeout: int,
+    base: float = 0.5,
+    cap: float = 5.0
+) -> Iterator[int]:
+    """
+    ポーリングの試行回数を順に返し、試行の間を指数バックオフ（ジッター付き）で待機します。
+    timeout秒が経過すると終了します。
+
+    Args:
+        timeout (int): タイムアウトまでの秒数
+        base (float, optional): 最初の待機秒数。デフォルトは0.5秒。
+        cap (float, optional): 待機秒数の上限。デフォルトは5秒。
+
+    Yields:
+        int: 試行回数（0始まり）
+
+    Examples:
+        >>> for _ in _poll_attempts(timeout=30):
+        ...     if fetch():
+        ...         break
+    """
+    start_time = time.time()
+    attempt = 0
+
+    while True:
+        yield attempt
+
+        elapsed = time.time() - start_time
+        if elapsed > timeout:
+            print(f"Timeout reached after {timeout} seconds")
+            return
+
+        _backoff_sleep(attempt, base, cap, remaining=timeout - elapsed)
+        attempt += 1
+
 def get_recording_discussion_ids(
     hy_client: hylable.HDClient,
     course_id: str,
@@ -43,22 +192,19 @@ def get_recording_discussion_ids(
         List[str]: 録音中のディスカッションIDのリスト
     """
     discussion_ids: List[str] = []
-    start_time = time.time()
-    
-    while len(discussion_ids) < max_discussions:
-        for discussion in hy_client.get_discussions(course_id):
+    seen: Set[str] = set()
+
+    for _ in _poll_attempts(timeout):
+        for discussion in _list_discussions(hy_client, course_id):
             if discussion.status == "recording":
-                if discussion.id not in discussion_ids:
+                if discussion.id not in seen:
+                    seen.add(discussion.id)
                     discussion_ids.append(discussion.id)
                     print(f"Found recording discussion: {discussion.id}")
-                
+
                 if len(discussion_ids) >= max_discussions:
                     print(f"Reached maximum number of discussions: {max_discussions}")
                     return discussion_ids
-        
-        if time.time() - start_time > timeout:
-            print(f"Timeout reached after {timeout} seconds")
-            break    
     return discussion_ids
 
 def get_discussion_ids(
@@ -82,38 +228,32 @@ def get_discussion_ids(
 
     Notes:
         - 指定されたmax_discussions数に達するか、timeout秒が経過するまでディスカッションを取得します。
-        - 3秒間隔でディスカッションの取得を試みます。
+        - 0.5秒から始まり最大5秒まで伸びる間隔（指数バックオフ）でディスカッションの取得を試みます。
     """
     discussion_ids: List[str] = []
-    start_time = time.time()
-    
-    while len(discussion_ids) < max_discussions:
-        for discussion in hy_client.get_discussions(course_id):
-            if discussion.id not in discussion_ids:
+    seen: Set[str] = set()
+
+    for _ in _poll_attempts(timeout):
+        for discussion in _list_discussions(hy_client, course_id):
+            if discussion.id not in seen:
+                seen.add(discussion.id)
                 discussion_ids.append(discussion.id)
                 print(f"Found discussion: {discussion.id}")
-                
+
                 if len(discussion_ids) >= max_discussions:
                     print(f"Reached maximum number of discussions: {max_discussions}")
                     return discussion_ids
-        
-        if time.time() - start_time > timeout:
-            print(f"Timeout reached after {timeout} seconds")
-            break
-        
-        time.sleep(3)
-    
     return discussion_ids
 
 #-----
 
-def get_all_discussion_ids(
+def iter_all_discussions(
     hy_client: hylable.HDClient,
     course_id: str,
     timeout: int = 30
-) -> List[Dict[str, str]]:
+) -> Iterator[Dict[str, str]]:
     """
-    指定されたコースからすべてのディスカッションIDとその情報を取得します。
+    指定されたコースのディスカッション情報を、見つかった順に1件ずつ返します。
     録音中、非録音に関わらずすべてのディスカッションを対象とします。
     録音日時はJST（日本時間）で表示されます。
 
@@ -122,27 +262,23 @@ def get_all_discussion_ids(
         course_id (str): 対象のコースID
         timeout (int, optional): タイムアウトまでの秒数。デフォルトは30秒。
 
-    Returns:
-        List[Dict[str, str]]: ディスカッションIDと詳細情報を含む辞書のリスト
-            {
-                'id': ディスカッションID,
-                'status': 録音状態,
-                'topic': トピック,
-                'comment': コメント,
-                'recordedAt': 録音日時（JST）,
-                'duration_sec': 録音時間（秒）,
-                'group_name': グループ名
-            }
+    Yields:
+        Dict[str, str]: ディスカッションIDと詳細情報を含む辞書
+            （形式はget_all_discussion_idsの各要素に、並べ替え用の
+            '_sort_key': 録音日時のUNIXタイムスタンプ を加えたもの）
+
+    Notes:
+        - 新しいディスカッションが見つからなくなった時点で取得を終了します。
+        - すべての取得を待たずに処理を始められるため、音声認識結果の取得と並行させる場合に使用します。
     """
-    discussions: List[Dict[str, str]] = []
-    found_ids = set()
-    start_time = time.time()
-    jst = pytz.timezone('Asia/Tokyo')
-    
-    while True:
-        for discussion in hy_client.get_discussions(course_id):
+    found_ids: Set[str] = set()
+
+    for _ in _poll_attempts(timeout):
+        new_count = 0
+        for discussion in _list_discussions(hy_client, course_id):
             if discussion.id not in found_ids:
                 found_ids.add(discussion.id)
+                new_count += 1
                 
                 # UTCの日時をJSTに変換
                 utc_time = discussion.recordedAt
@@ -150,8 +286,8 @@ def get_all_discussion_ids(
                     utc_time = datetime.fromisoformat(utc_time.replace('Z', '+00:00'))
                 
                 if utc_time.tzinfo is None:
-                    utc_time = pytz.utc.localize(utc_time)
-                jst_time = utc_time.astimezone(jst)
+                    utc_time = utc_time.replace(tzinfo=UTC)
+                jst_time = utc_time.astimezone(JST)
                 
                 discussion_info = {
                     'id': discussion.id,
@@ -160,47 +296,290 @@ def get_all_discussion_ids(
                     'comment': discussion.comment,
                     'recordedAt': jst_time.strftime('%Y-%m-%d %H:%M:%S %Z'),
                     'duration_sec': discussion.duration_sec,
-                    'group_name': discussion.group_name
+                    'group_name': discussion.group_name,
+                    '_recorded_dt': jst_time,
+                    '_duration_str': seconds_to_time_format(discussion.duration_sec),
+                    '_discussion': discussion,
+                    '_sort_key': jst_time.timestamp()
                 }
-                discussions.append(discussion_info)
                 print(f"Found discussion: {discussion.id}")
-        
-        if time.time() - start_time > timeout:
-            print(f"Timeout reached after {timeout} seconds")
-            break
-        
-        if len(found_ids) == len(discussions):
+                yield discussion_info
+
+        if new_count == 0:
             print("All discussions have been retrieved")
+            return
+
+def get_all_discussion_ids(
+    hy_client: hylable.HDClient,
+    course_id: str,
+    timeout: int = 30
+) -> List[Dict[str, str]]:
+    """
+    指定されたコースからすべてのディスカッションIDとその情報を取得します。
+    録音中、非録音に関わらずすべてのディスカッションを対象とします。
+    録音日時はJST（日本時間）で表示されます。
+
+    Args:
+        hy_client (hylable.HDClient): Hylableクライアントインスタンス
+        course_id (str): 対象のコースID
+        timeout (int, optional): タイムアウトまでの秒数。デフォルトは30秒。
+
+    Returns:
+        List[Dict[str, str]]: ディスカッションIDと詳細情報を含む辞書のリスト（録音日時の新しい順）
+            {
+                'id': ディスカッションID,
+                'status': 録音状態,
+                'topic': トピック,
+                'comment': コメント,
+                'recordedAt': 録音日時（JST）,
+                'duration_sec': 録音時間（秒）,
+                'group_name': グループ名,
+                '_recorded_dt': 録音日時（JSTのdatetime）,
+                '_duration_str': 録音時間（「00_00_00」形式）,
+                '_discussion': 一覧取得で得たhylable.Discussionオブジェクト
+            }
+
+    Notes:
+        - 新しいディスカッションが見つからなくなった時点で取得を終了します。
+    """
+    discussions: List[Dict[str, str]] = list(iter_all_discussions(hy_client, course_id, timeout))
+    discussions.sort(key=lambda x: x['_sort_key'], reverse=True)
+    for discussion_info in discussions:
+        del discussion_info['_sort_key']
+    return discussions
+
+def _store_in_cache(key: Tuple[str, str], value: Any, now: float) -> None:
+    """
+    値をキャッシュに登録します。_cache_lockを取得した状態で呼び出してください。
+    期限切れのエントリを削除し、件数がCACHE_MAXSIZEを超えた場合は古い順に削除します。
+
+    Args:
+        key (Tuple[str, str]): キャッシュのキー（種別, ディスカッションID）
+        value (Any): 登録する値
+        now (float): 登録時刻（time.monotonic()の値）
+    """
+    # 既存のキーは末尾に移動させ、登録順（＝古い順）を保つ
+    _cache.pop(key, None)
+    # 登録順に並んでいるため、先頭から期限切れのものを削除する
+    while _cache:
+        oldest_key = next(iter(_cache))
+        if now - _cache[oldest_key][0] < CACHE_TTL_SEC:
             break
-    
-    discussions.sort(key=lambda x: datetime.strptime(x['recordedAt'], '%Y-%m-%d %H:%M:%S %Z'), reverse=True)
+        del _cache[oldest_key]
+    _cache[key] = (now, value)
+    while len(_cache) > CACHE_MAXSIZE:
+        del _cache[next(iter(_cache))]
+
+def _cached_call(
+    key: Tuple[str, str],
+    fetch_fn: Callable[[], Any],
+    cache_result: bool = True
+) -> Any:
+    """
+    TTL付きのキャッシュを介してAPIを呼び出します。
+    同じキーに対する呼び出しが並行した場合、HTTPリクエストは1回だけ行い結果を共有します。
+
+    Args:
+        key (Tuple[str, str]): キャッシュのキー（種別, ディスカッションID）
+        fetch_fn (Callable[[], Any]): キャッシュがない場合に呼び出す取得処理
+        cache_result (bool, optional): Falseの場合は結果をキャッシュせず、
+            並行する呼び出しの共有のみを行う。デフォルトはTrue。
+
+    Returns:
+        Any: fetch_fnの戻り値（キャッシュされた値を含む）
+    """
+    with _cache_lock:
+        entry = _cache.get(key)
+        if entry is not None and time.monotonic() - entry[0] < CACHE_TTL_SEC:
+            return entry[1]
+        future = _inflight.get(key)
+        is_owner = future is None
+        if is_owner:
+            future = Future()
+            _inflight[key] = future
+
+    if not is_owner:
+        return future.result()
+
+    try:
+        value = fetch_fn()
+    except BaseException as e:
+        with _cache_lock:
+            del _inflight[key]
+        future.set_exception(e)
+        raise
+
+    with _cache_lock:
+        if cache_result:
+            _store_in_cache(key, value, time.monotonic())
+        del _inflight[key]
+    future.set_result(value)
+    return value
+
+def _cached_get_discussion(
+    hy_client: hylable.HDClient,
+    discussion_id: str
+) -> hylable.Discussion:
+    """
+    キャッシュを介してディスカッションの詳細を取得します。
+
+    Args:
+        hy_client (hylable.HDClient): Hylableクライアントインスタンス
+        discussion_id (str): ディスカッションID
+
+    Returns:
+        hylable.Discussion: ディスカッションのオブジェクト
+    """
+    return _cached_call(
+        ('discussion', discussion_id),
+        lambda: _call_with_retry(lambda: hy_client.get_discussion(discussion_id))
+    )
+
+def _cached_get_asr(
+    hy_client: hylable.HDClient,
+    discussion: hylable.Discussion
+) -> List[dict]:
+    """
+    ディスカッションの音声認識結果を取得します。
+    同じディスカッションに対する並行した呼び出しはHTTPリクエストを共有します。
+    音声認識結果は大きく、1回の実行で同じものを再取得することもないため、結果はメモリに保持しません。
+
+    Args:
+        hy_client (hylable.HDClient): Hylableクライアントインスタンス
+        discussion (hylable.Discussion): ディスカッションのオブジェクト
+
+    Returns:
+        List[dict]: 音声認識結果のリスト
+    """
+    return _cached_call(
+        ('asr', discussion.id),
+        lambda: _call_with_retry(lambda: hy_client.get_asr(discussion)),
+        cache_result=False
+    )
+
+def _list_discussions(
+    hy_client: hylable.HDClient,
+    course_id: str
+) -> List[hylable.Discussion]:
+    """
+    コース内のディスカッション一覧を取得し、各ディスカッションをキャッシュに登録します。
+
+    Hylable SDKにはディスカッション詳細や音声認識結果を複数件まとめて取得するAPIがないため、
+    一覧取得（1回のページング呼び出し）の結果をget_discussionの代わりとして使い、
+    ディスカッションごとのget_discussion呼び出しを省きます。
+    一覧の結果にはget_asrに必要なIDとメンバー情報が含まれています。
+
+    Args:
+        hy_client (hylable.HDClient): Hylableクライアントインスタンス
+        course_id (str): 対象のコースID
+
+    Returns:
+        List[hylable.Discussion]: ディスカッションのリスト
+    """
+    discussions = _call_with_retry(lambda: hy_client.get_discussions(course_id))
+    now = time.monotonic()
+    with _cache_lock:
+        for discussion in discussions:
+            _store_in_cache(('discussion', discussion.id), discussion, now)
     return discussions
 
+class AsrCache:
+    """
+    音声認識結果をSQLiteに保存する永続キャッシュ
+
+    分析が完了したディスカッションの音声認識結果は変化しないため、
+    (ディスカッションID, 録音時間) をキーとして保存し、再実行時のAPI呼び出しを省きます。
+    複数スレッドから利用できるよう、接続はロックで保護しています。
+
+    Examples:
+        >>> with AsrCache() as asr_cache:
+        ...     result = get_single_discussion_text(hy_client, discussion_id, asr_cache)
+    """
+
+    def __init__(self, path: Union[str, Path] = "asr_cache.sqlite"):
+        """
+        Args:
+            path (Union[str, Path], optional): SQLiteファイルのパス。デフォルトは「asr_cache.sqlite」。
+        """
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS asr(id TEXT PRIMARY KEY, duration INT, texts TEXT)"
+            )
+
+    def get(self, discussion_id: str, duration_sec: int) -> Union[List[str], None]:
+        """
+        キャッシュされた音声認識テキストを取得します。
+
+        Args:
+            discussion_id (str): ディスカッションID
+            duration_sec (int): 録音時間（秒）
+
+        Returns:
+            Union[List[str], None]: テキストのリスト。キャッシュがない場合はNone
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT texts FROM asr WHERE id=? AND duration=?",
+                (discussion_id, duration_sec)
+            ).fetchone()
+        return None if row is None else json.loads(row[0])
+
+    def put(self, discussion_id: str, duration_sec: int, texts: List[str]) -> None:
+        """
+        音声認識テキストをキャッシュに保存します。
+
+        Args:
+            discussion_id (str): ディスカッションID
+            duration_sec (int): 録音時間（秒）
+            texts (List[str]): テキストのリスト
+        """
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO asr(id, duration, texts) VALUES (?, ?, ?)",
+                (discussion_id, duration_sec, json.dumps(texts, ensure_ascii=False))
+            )
+
+    def close(self) -> None:
+        """SQLiteの接続を閉じます。"""
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self) -> "AsrCache":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
 def get_discussion_texts(
     hy_client: hylable.HDClient,
     discussion_ids: List[str]
 ) -> List[Dict[str, Union[str, List[str]]]]:
     """
     指定されたディスカッションIDのリストに対応する音声認識結果を取得します。
+    取得はスレッドプールで並行して行い、結果は指定したIDの順に返します。
 
     Args:
         hy_client (hylable.HDClient): Hylableクライアントインスタンス
         discussion_ids (List[str]): ディスカッションIDのリスト
 
     Returns:
-        List[Dict[str, Union[str, List[str]]]]: 各ディスカッションのIDとテキストのリストを含む辞書のリスト
+        List[Dict[str, Union[str, List[str]]]]: 各ディスカッションのIDとテキストのリストを含む辞書のリスト。
+        エラーが発生したディスカッションは含まれません
     """
-    results: List[Dict[str, Union[str, List[str]]]] = []
-    for discussion_id in discussion_ids:
-        discussion = hy_client.get_discussion(discussion_id)
-        metadatas = hy_client.get_asr(discussion)
-        texts: List[str] = [item['text'] for item in metadatas]
-        results.append({"discussion_id": discussion_id, "texts": texts})
-    return results
+    with ThreadPoolExecutor(max_workers=min(16, len(discussion_ids) or 1)) as executor:
+        results = list(executor.map(
+            lambda discussion_id: get_single_discussion_text(hy_client, discussion_id),
+            discussion_ids
+        ))
+    return [result for result in results if result is not None]
 
 def get_single_discussion_text(
     hy_client: hylable.HDClient,
-    discussion_id: str
+    discussion_id: str,
+    asr_cache: Union[AsrCache, None] = None,
+    discussion: Union[hylable.Discussion, None] = None
 ) -> Dict[str, Union[str, List[str]]]:
     """
     指定されたディスカッションIDの音声認識結果を取得します。
@@ -208,15 +587,29 @@ def get_single_discussion_text(
     Args:
         hy_client (hylable.HDClient): Hylableクライアントインスタンス
         discussion_id (str): ディスカッションID
+        asr_cache (Union[AsrCache, None], optional): 音声認識結果の永続キャッシュ。
+            指定した場合、分析が完了したディスカッションの結果を保存・再利用する。デフォルトはNone。
+        discussion (Union[hylable.Discussion, None], optional): 取得済みのディスカッションオブジェクト。
+            指定した場合、get_discussionの呼び出しを省略する。デフォルトはNone。
 
     Returns:
         Dict[str, Union[str, List[str]]]: ディスカッションIDとテキストのリストを含む辞書。
         エラーが発生した場合はNone
     """
     try:
-        discussion = hy_client.get_discussion(discussion_id)
-        metadatas = hy_client.get_asr(discussion)
+        # get_asrはIDに加えてメンバー情報（発話者の対応付け）を参照するため、
+        # IDだけのスタブでは代用できない。取得済みのオブジェクトがあればそれを使う
+        if discussion is None:
+            discussion = _cached_get_discussion(hy_client, discussion_id)
+        if asr_cache is not None:
+            texts = asr_cache.get(discussion_id, discussion.duration_sec)
+            if texts is not None:
+                return {"discussion_id": discussion_id, "texts": texts}
+
+        metadatas = _cached_get_asr(hy_client, discussion)
         texts: List[str] = [item['text'] for item in metadatas]
+        if asr_cache is not None and discussion.status == "completed":
+            asr_cache.put(discussion_id, discussion.duration_sec, texts)
         return {"discussion_id": discussion_id, "texts": texts}
     except IndexError as e:
         print(f"ディスカッション {discussion_id} の処理中にインデックスエラーが発生しました: {str(e)}")
@@ -230,46 +623,61 @@ if __name__ == "__main__":
     # courseIDの指定
     course_id: str = "crs_89881258-9606-4d85-86cb-ad514df18c1f"
     
+    # Hylableクライアントの初期化
+    hy_client = get_hy_client()
+
     output_dir = Path(f"./{course_id}")
     output_dir.mkdir(parents=True, exist_ok=True)  # ディレクトリが存在しない場合は作成
 
-    # すべてのディスカッションIDを取得
+    # ディスカッションの取得と音声認識結果の取得を並行して行う
+    # 音声認識結果の取得はI/O待ちが中心のため、スレッドプールで並行して取得する
+    # ファイルへの書き込みは競合を避けるためメインスレッドで行う
     print("=== すべてのディスカッションの取得 ===")
-    all_discussions: List[Dict[str, str]] = get_all_discussion_ids(hy_client, course_id, timeout=30)
-    print(f"\ncourseID内に検出されたディスカッションの総数: {len(all_discussions)}")
-    print("\n検出されたディスカッションの詳細:")
-    print("\n" + "="*50 + "\n")
-    
-    print("=== すべてのディスカッションの情報 ===")
-    if all_discussions:
-        for discussion in tqdm(all_discussions, desc="Processing discussions"):
- 
-            print("\n=== ディスカッションの音声認識結果 ===")
-            print(f"ID: {discussion['id']}")
-            topic = "topic未設定"
-            if discussion['topic']:
-                print(f"トピック: {discussion['topic']}")
-                topic = discussion['topic'].replace('/', '／')
-            group_name = "group未設定"
-            if discussion['group_name']:
-                print(f"グループ名: {discussion['group_name']}")
-                group_name = discussion['group_name']
-            
-            result = get_single_discussion_text(hy_client, discussion['id'])
-            if result is None:
-                print(f"ディスカッション {discussion['id']} をエラーのためスキップします")
+    all_discussions: List[Dict[str, str]] = []
+    with AsrCache() as asr_cache, ThreadPoolExecutor(max_workers=8) as executor:
+        futures = {}
+        for discussion in iter_all_discussions(hy_client, course_id, timeout=30):
+            all_discussions.append(discussion)
+            # 録音時間が0秒または録音中のディスカッションは音声認識結果がないため取得しない
+            if discussion['duration_sec'] == 0 or discussion['status'] == "recording":
+                print(f"ディスカッション {discussion['id']} は音声認識結果がないためスキップします")
                 continue
-            if result['texts']:
-                # print("\n音声認識テキスト:")
-                # for text in result['texts']:
-                #     print(text)
-                dt = datetime.strptime(discussion['recordedAt'], "%Y-%m-%d %H:%M:%S JST")
-                formatted_date = dt.strftime("%Y%m%d_%H%M%S")
-                filename = f"{formatted_date}({seconds_to_time_format(discussion['duration_sec'])})_{discussion['id']}_{topic}_{group_name}.asr.txt"
-                with open(output_dir / filename, 'a', encoding='utf-8') as file:
-                    file.write('\n'.join(result['texts']) + '\n')
-            else:
-                print("\n音声認識テキストはありません")
+            futures[executor.submit(
+                get_single_discussion_text, hy_client, discussion['id'], asr_cache, discussion['_discussion']
+            )] = discussion
+        all_discussions.sort(key=lambda x: x['_sort_key'], reverse=True)
+        print(f"\ncourseID内に検出されたディスカッションの総数: {len(all_discussions)}")
+        print("\n" + "="*50 + "\n")
+
+        print("=== すべてのディスカッションの情報 ===")
+        if futures:
+            for future in tqdm(as_completed(futures), total=len(futures), desc="Processing discussions"):
+                discussion = futures[future]
+
+                print("\n=== ディスカッションの音声認識結果 ===")
+                print(f"ID: {discussion['id']}")
+                if discussion['topic']:
+                    print(f"トピック: {discussion['topic']}")
+                topic = _sanitize_filename_part(discussion['topic'] or "topic未設定")
+                if discussion['group_name']:
+                    print(f"グループ名: {discussion['group_name']}")
+                group_name = _sanitize_filename_part(discussion['group_name'] or "group未設定")
+
+                result = future.result()
+                if result is None:
+                    print(f"ディスカッション {discussion['id']} をエラーのためスキップします")
+                    continue
+                if result['texts']:
+                    # print("\n音声認識テキスト:")
+                    # for text in result['texts']:
+                    #     print(text)
+                    formatted_date = discussion['_recorded_dt'].strftime("%Y%m%d_%H%M%S")
+                    filename = f"{formatted_date}({discussion['_duration_str']})_{discussion['id']}_{topic}_{group_name}.asr.txt"
+                    with open(output_dir / filename, 'a', encoding='utf-8', buffering=1 << 20) as file:
+                        file.write('\n'.join(result['texts']))
+                        file.write('\n')
+                else:
+                    print("\n音声認識テキストはありません")
     print("\n" + "="*50 + "\n処理が完了しました")
 
 # -------------------------------------------------    
@@ -1,7 +1,9 @@
 import requests
-import json
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import orjson
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional
 import logging
 import os
 from dotenv import load_dotenv
@@ -17,6 +19,9 @@ class MiroBoardBackup:
     - JSONフォーマットでのバックアップ保存
     """
     
+    # アイテム取得時の1ページあたりの件数（Miro APIの上限値）
+    ITEMS_PAGE_LIMIT = 50
+    
     def __init__(self, access_token: str):
         """
         MiroBoardBackupクラスの初期化
@@ -32,6 +37,20 @@ class MiroBoardBackup:
             "Accept": "application/json"
         }
         
+        # HTTPセッションの設定
+        # 接続を使い回し（keep-alive）、429/5xxは指数バックオフで自動リトライする
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        retry = Retry(
+            total=5,
+            backoff_factor=0.5,
+            status_forcelist=[429, 500, 502, 503, 504]
+        )
+        self.session.mount(
+            "https://",
+            HTTPAdapter(pool_connections=1, pool_maxsize=10, max_retries=retry)
+        )
+        
         # ロギングの設定
         logging.basicConfig(
             level=logging.INFO,
@@ -50,9 +69,8 @@ class MiroBoardBackup:
             Dict: ボード情報（名前、作成者、権限など）
         """
         try:
-            response = requests.get(
-                f"{self.base_url}/boards/{board_id}",
-                headers=self.headers
+            response = self.session.get(
+                f"{self.base_url}/boards/{board_id}"
             )
             response.raise_for_status()
             return response.json()
@@ -60,54 +78,77 @@ class MiroBoardBackup:
             self.logger.error(f"ボード情報の取得に失敗しました: {str(e)}")
             raise
 
-    def get_all_items(self, board_id: str) -> List[Dict]:
+    def iter_all_items(self, board_id: str) -> Iterator[Dict]:
         """
-        ボード上の全アイテムを取得
+        ボード上の全アイテムを1件ずつ取得
+        
+        ページ単位で取得しながら返すため、全アイテムをメモリに保持しない
         
         引数:
             board_id (str): バックアップ対象のMiroボードID
             
         戻り値:
-            List[Dict]: ボード上の全アイテムのリスト
+            Iterator[Dict]: ボード上のアイテム
         """
-        items = []
+        item_count = 0
         cursor = None
         
         try:
             while True:
-                params = {"cursor": cursor} if cursor else {}
-                response = requests.get(
+                # 1ページあたりの取得件数をAPIの上限(50)にしてリクエスト回数を減らす
+                params = {"limit": self.ITEMS_PAGE_LIMIT}
+                if cursor:
+                    params["cursor"] = cursor
+                response = self.session.get(
                     f"{self.base_url}/boards/{board_id}/items",
-                    headers=self.headers,
                     params=params
                 )
                 response.raise_for_status()
-                data = response.json()
+                # 次ページのカーソルはレスポンス本文にしか無いため、ページ取得は逐次で行い、
+                # 大きなdata配列のパースはorjsonで高速化する
+                data = orjson.loads(response.content)
                 
-                items.extend(data.get("data", []))
+                page_items = data.get("data", [])
+                item_count += len(page_items)
+                yield from page_items
                 cursor = data.get("cursor")
                 
                 if not cursor:
                     break
                 
-                self.logger.debug(f"取得済みアイテム数: {len(items)}")
-                    
-            return items
+                self.logger.debug(f"取得済みアイテム数: {item_count}")
         except requests.exceptions.RequestException as e:
             self.logger.error(f"アイテムの取得に失敗しました: {str(e)}")
             raise
 
+    def get_all_items(self, board_id: str) -> List[Dict]:
+        """
+        ボード上の全アイテムを取得
+        
+        引数:
+            board_id (str): バックアップ対象のMiroボードID
+            
+        戻り値:
+            List[Dict]: ボード上の全アイテムのリスト
+        """
+        return list(self.iter_all_items(board_id))
+
     def backup_board(self, board_id: str, output_path: str) -> Dict:
         """
         Miroボードの完全バックアップを実行し、JSONファイルとして保存
         
+        アイテムはページ単位で取得しながらファイルへ書き出すため、
+        ボードの大きさに関わらずメモリ使用量はほぼ一定
+        書き込みは一時ファイルに行い、完了後に保存先へ置き換える
+        
         引数:
             board_id (str): バックアップ対象のMiroボードID
             output_path (str): バックアップJSONファイルの保存先パス
             
         戻り値:
-            Dict: バックアップデータ全体
+            Dict: バックアップデータのうちアイテム以外の部分（board, metadata）
         """
+        tmp_path = f"{output_path}.tmp"
         try:
             self.logger.info(f"ボード {board_id} のバックアップを開始します...")
             
@@ -115,31 +156,36 @@ class MiroBoardBackup:
             board_info = self.get_board(board_id)
             self.logger.info(f"ボード情報の取得が完了しました: {board_info.get('name', 'Unknown Board')}")
             
-            # 全アイテムの取得
-            items = self.get_all_items(board_id)
-            self.logger.info(f"全アイテムの取得が完了しました（合計: {len(items)}個）")
-            
-            # バックアップデータの作成
-            backup_data = {
-                "board": board_info,
-                "items": items,
-                "metadata": {
+            # 全アイテムを取得しながらJSONファイルとして保存
+            item_count = 0
+            with open(tmp_path, 'wb') as f:
+                f.write(b'{\n  "board": ')
+                f.write(orjson.dumps(board_info, option=orjson.OPT_NON_STR_KEYS))
+                f.write(b',\n  "items": [')
+                for item in self.iter_all_items(board_id):
+                    f.write(b',\n    ' if item_count else b'\n    ')
+                    f.write(orjson.dumps(item, option=orjson.OPT_NON_STR_KEYS))
+                    item_count += 1
+                self.logger.info(f"全アイテムの取得が完了しました（合計: {item_count}個）")
+                
+                metadata = {
                     "backup_date": datetime.now().isoformat(),
-                    "item_count": len(items),
+                    "item_count": item_count,
                     "board_name": board_info.get('name', 'Unknown Board')
                 }
-            }
-            
-            # JSONファイルとして保存
-            with open(output_path, 'w', encoding='utf-8') as f:
-                json.dump(backup_data, f, indent=2, ensure_ascii=False)
+                f.write(b'\n  ],\n  "metadata": ' if item_count else b'],\n  "metadata": ')
+                f.write(orjson.dumps(metadata))
+                f.write(b'\n}\n')
+            os.replace(tmp_path, output_path)
             
             self.logger.info(f"バックアップが完了しました。保存先: {output_path}")
-            self.logger.info(f"バックアップしたアイテム数: {len(items)}")
+            self.logger.info(f"バックアップしたアイテム数: {item_count}")
             
-            return backup_data
+            return {"board": board_info, "metadata": metadata}
             
         except Exception as e:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
             self.logger.error(f"バックアップに失敗しました: {str(e)}")
             raise
 